@@ -1,10 +1,18 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from transformers import pipeline
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 import os
+import threading
+from contextlib import closing
+
+from platforms import MODEL_NAME, PLATFORMS
+from inference_worker import remote_analyzer_from_env
+from bulk_jobs import BulkScoringJob, save_upload, csv_columns, cleanup_uploads
+from aspect_index import INDEX_FILE, top_negative_aspects, aspect_negative_rates
+import job_queue
+import results_store
 
 # --- 1. Page Configuration ---
 st.set_page_config(
@@ -13,44 +21,150 @@ st.set_page_config(
     layout="wide"
 )
 
+EXPLORER_ROWS = 5000    # Rows loaded into the on-screen data explorer
+WORDCLOUD_REVIEWS = 20000    # Reviews the word cloud is built from
+
 # --- 2. Load AI Model (Cached for optimized performance) ---
 @st.cache_resource
 def load_sentiment_model():
     """
     Loads the multilingual DistilBERT model. 
     @st.cache_resource ensures the model is only loaded once into memory.
+    When SENTIMENT_WORKER_URL is set, the replica talks to the shared
+    inference worker instead and never loads torch or the weights itself.
     """
+    remote = remote_analyzer_from_env()
+    if remote is not None:
+        return remote
+
+    from transformers import pipeline
     return pipeline(
         "sentiment-analysis", 
-        model="lxyuan/distilbert-base-multilingual-cased-sentiments-student"
+        model=MODEL_NAME
     )
 
 analyzer = load_sentiment_model()
 
+@st.cache_resource
+def get_analyzer_lock():
+    """
+    One lock per server process around the shared model: the pipeline is not
+    thread-safe and is called from the script thread and the bulk-job threads.
+    (A plain module-level lock would be recreated on every Streamlit rerun.)
+    """
+    return threading.Lock()
+
 # --- 3. Refined Analysis Logic ---
-def get_refined_sentiment(text):
+POSITIVE_SLANG = ['niyamai', 'lassanai', 'sathutui', 'hondayi', 'good', 'super', 'pattayi', 'love', 'maru']
+
+def get_refined_sentiments(texts):
     """
     Handles Singlish/English nuances by combining AI predictions 
     with a keyword heuristic override for better accuracy.
+    Scores a whole batch in one model call; returns (label, confidence) per text.
     """
-    positive_slang = ['niyamai', 'lassanai', 'sathutui', 'hondayi', 'good', 'super', 'pattayi', 'love', 'maru']
-    text_lower = text.lower()
+    # Run AI Analysis (without batch_size the pipeline runs one forward pass per text)
+    with get_analyzer_lock():
+        results = analyzer([text[:512] for text in texts], batch_size=len(texts), truncation=True)
     
-    # Run AI Analysis
-    result = analyzer(text[:512])[0]
-    label = result['label'].upper()
-    score = result['score']
-    
-    # Heuristic: Override AI if specific positive keywords are present
-    for word in positive_slang:
-        if word in text_lower and "NEGATIVE" in label:
-            return "POSITIVE (Verified)", 0.95
-            
-    return label, score
+    refined = []
+    for text, result in zip(texts, results):
+        label = result['label'].upper()
+        score = result['score']
+        
+        # Heuristic: Override AI if specific positive keywords are present
+        text_lower = text.lower()
+        if "NEGATIVE" in label and any(word in text_lower for word in POSITIVE_SLANG):
+            refined.append(("POSITIVE (Verified)", 0.95))
+        else:
+            refined.append((label, score))
+    return refined
+
+def get_refined_sentiment(text):
+    """
+    Single-review wrapper used by the Real-time Analysis module.
+    """
+    return get_refined_sentiments([text])[0]
+
+@st.cache_resource
+def get_bulk_jobs():
+    """
+    Registry of background bulk-scoring jobs of this server process.
+    Cached as a resource so jobs survive reruns while their threads keep working;
+    each session only shows the job IDs stored in its own st.session_state.
+    """
+    return {}
+
+@st.cache_data
+def load_aspect_index(path, modified_time):
+    """
+    Loads the precomputed aspect x sentiment index.
+    The file's modification time is part of the cache key, so a rebuilt index is picked up.
+    """
+    return pd.read_csv(path)
+
+def results_store_key():
+    """
+    Modification times of all Analyzed_*_Final.csv files plus whether the store exists.
+    """
+    mtimes = tuple(
+        os.path.getmtime(config["output"]) if os.path.exists(config["output"]) else None
+        for config in PLATFORMS.values()
+    )
+    return mtimes, os.path.exists(results_store.DB_FILE)
+
+@st.cache_data
+def sync_results_store(store_key):
+    """
+    Sets up the shared results store and imports any Analyzed_*_Final.csv that is
+    newer than the rows it holds. Only runs again when one of the CSVs changes.
+    """
+    with closing(results_store.connect()) as conn:
+        return results_store.sync_csv_outputs(conn)
+
+def open_results_store():
+    """
+    Read connection to the synced results store. Use it in a 'with closing(...)' block.
+    """
+    sync_results_store(results_store_key())
+    return results_store.connect(setup=False)
+
+@st.cache_data(max_entries=20)
+def word_cloud_corpus(platform, sentiments, store_key):
+    """
+    Text of the first WORDCLOUD_REVIEWS matching reviews (cleaned where available).
+    Cached until the store changes, so widget changes do not re-read every review.
+    """
+    with closing(open_results_store()) as store:
+        return " ".join(results_store.review_texts(store, platform, list(sentiments), limit=WORDCLOUD_REVIEWS))
+
+@st.cache_data(max_entries=4)
+def export_report(platform, sentiments, store_key):
+    """
+    Full CSV export of a platform's filtered reviews, cached until the store changes.
+    """
+    with closing(open_results_store()) as store:
+        return results_store.export_csv(store, platform, list(sentiments))
 
 # --- 4. Sidebar Navigation ---
 st.sidebar.title("Project Controls")
-app_mode = st.sidebar.radio("Select Module:", ["Real-time Analysis", "Data Dashboard"])
+app_mode = st.sidebar.radio("Select Module:", ["Real-time Analysis", "Data Dashboard", "Cross-Platform Comparison"])
+
+# Status of the platform refresh queue (filled by 'python job_queue.py enqueue')
+if os.path.exists(job_queue.DB_FILE):
+    with st.sidebar.expander("🗂️ Refresh Jobs"):
+        with closing(job_queue.connect()) as queue:
+            jobs = [dict(row) for row in job_queue.job_status(queue)]
+        jobs_df = pd.DataFrame(
+            jobs,
+            columns=['id', 'platform', 'priority', 'status', 'attempts', 'max_attempts', 'created_at', 'finished_at', 'error']
+        )
+        if jobs_df.empty:
+            st.caption("No refresh jobs queued yet.")
+        else:
+            status_counts = jobs_df['status'].value_counts()
+            st.caption(" | ".join(f"{status}: {count}" for status, count in status_counts.items()))
+            st.dataframe(jobs_df[['id', 'platform', 'status', 'attempts']], use_container_width=True, hide_index=True)
 
 # --- MODULE 1: Real-time Analysis ---
 if app_mode == "Real-time Analysis":
@@ -61,7 +175,12 @@ if app_mode == "Real-time Analysis":
     
     if st.button("Analyze Sentiment"):
         if user_input.strip():
-            label, confidence = get_refined_sentiment(user_input)
+            try:
+                label, confidence = get_refined_sentiment(user_input)
+            except OSError as e:
+                # Raised by the shared inference worker client when the worker is down or fails
+                st.error(f"Sentiment model unavailable: {e}")
+                st.stop()
             
             # UI Feedback based on sentiment
             if "POSITIVE" in label:
@@ -74,41 +193,93 @@ if app_mode == "Real-time Analysis":
         else:
             st.warning("Please enter some text to begin analysis.")
 
+    # --- Bulk CSV Analysis (Background Jobs) ---
+    st.divider()
+    st.subheader("📂 Bulk CSV Analysis")
+    st.markdown("Upload a CSV, pick the review column and let it score in the background.")
+    
+    uploaded_file = st.file_uploader("Upload Reviews CSV:", type=["csv"])
+    
+    if uploaded_file is not None:
+        # Copy the upload to disk once; reruns reuse the same file
+        upload_key = (uploaded_file.name, uploaded_file.size)
+        if st.session_state.get("upload_key") != upload_key or not os.path.exists(st.session_state["upload_path"]):
+            st.session_state["upload_path"] = save_upload(uploaded_file)
+            st.session_state["upload_key"] = upload_key
+        upload_path = st.session_state["upload_path"]
+        
+        text_column = st.selectbox("Select Review Text Column:", csv_columns(upload_path))
+        
+        if st.button("Start Bulk Analysis"):
+            job = BulkScoringJob(upload_path, uploaded_file.name, text_column, get_refined_sentiments)
+            get_bulk_jobs()[job.id] = job
+            st.session_state.setdefault("bulk_job_ids", []).append(job.id)
+            job.start()
+            st.success(f"Job {job.id} started. Scoring continues in the background.")
+    
+    # Drop expired jobs and leftover files, then show only this session's jobs
+    all_jobs = get_bulk_jobs()
+    cleanup_uploads(all_jobs)
+    st.session_state["bulk_job_ids"] = [job_id for job_id in st.session_state.get("bulk_job_ids", []) if job_id in all_jobs]
+    jobs = [all_jobs[job_id] for job_id in st.session_state["bulk_job_ids"]]
+    
+    if jobs:
+        st.button("🔄 Refresh Job Status")
+        
+        for job in reversed(jobs):
+            with st.expander(f"Job {job.id} | {job.file_name} | {job.status.upper()}", expanded=not job.finished):
+                st.progress(job.progress, text=f"{job.rows_done:,} / {job.total_rows or 0:,} rows scored")
+                
+                if job.status == "failed":
+                    st.error(f"Job failed: {job.error}")
+                elif not job.finished and st.button("Cancel Job", key=f"cancel_{job.id}"):
+                    job.cancel()
+                    st.warning("Cancellation requested. The job stops after the current batch.")
+                
+                if os.path.exists(job.result_path):
+                    # Preview only the first rows; the full result stays on disk
+                    st.dataframe(pd.read_csv(job.result_path, nrows=1000), use_container_width=True)
+                    with open(job.result_path, "rb") as result_file:
+                        st.download_button(
+                            label="📥 Export Results as CSV",
+                            data=result_file,
+                            file_name=f"{os.path.splitext(job.file_name)[0]}_Sentiment_Report.csv",
+                            mime='text/csv',
+                            key=f"export_{job.id}"
+                        )
+                
+                if job.finished and st.button("🗑️ Remove Job", key=f"remove_{job.id}"):
+                    job.discard()
+                    del all_jobs[job.id]
+                    st.session_state["bulk_job_ids"].remove(job.id)
+                    st.rerun()
+
 # --- MODULE 2: Data Dashboard ---
 elif app_mode == "Data Dashboard":
     st.title("📊 Strategic Business Insights")
     st.markdown("Interactive visualization of customer feedback across multi-platform datasets.")
 
-    # Dictionary mapping for all analyzed CSV files
-    data_files = {
-        "Alibaba": "Analyzed_Alibaba_Final.csv",
-        "Walmart": "Analyzed_Walmart_Final.csv",
-        "Shein": "Analyzed_Shein_Final.csv",
-        "Amazon": "Analyzed_Amazon shopping_Final.csv",
-        "AliExpress": "Analyzed_Aliexpress_Final.csv",
-        "Daraz": "Analyzed_Daraz online shopping App_Final.csv",
-        "Romanized Sinhala": "Analyzed_Romanized_Sinhala_Final.csv",
-        "Converted Data": "Analyzed_Converted_Data_Final.csv"
-    }
-    
-    platform = st.selectbox("Select Dataset to Visualize:", list(data_files.keys()))
-    file_path = data_files[platform]
-
-    if os.path.exists(file_path):
-        # Load Data
-        df = pd.read_csv(file_path)
-        df['sentiment'] = df['sentiment'].str.upper()
-
-        # Sidebar Filters
-        st.sidebar.subheader("Dashboard Filters")
-        sentiments = df['sentiment'].unique().tolist()
-        selected_sentiments = st.sidebar.multiselect("Filter by Sentiment:", sentiments, default=sentiments)
-        
-        filtered_df = df[df['sentiment'].isin(selected_sentiments)]
+    platform = st.selectbox("Select Dataset to Visualize:", list(PLATFORMS.keys()))
+
+    # All analyzed results are queried from the shared results store, over one connection per rerun
+    with closing(open_results_store()) as store:
+        stored_platforms = results_store.platforms_in_store(store)
+
+        if platform in stored_platforms:
+            # Sidebar Filters
+            st.sidebar.subheader("Dashboard Filters")
+            sentiments = results_store.sentiment_counts(store, platform)['sentiment'].tolist()
+            selected_sentiments = st.sidebar.multiselect("Filter by Sentiment:", sentiments, default=sentiments)
+
+            counts = results_store.sentiment_counts(store, platform, selected_sentiments)
+            explorer_df = results_store.filtered_reviews(store, platform, selected_sentiments, limit=EXPLORER_ROWS)
+
+    if platform in stored_platforms:
+        total_reviews = int(counts['reviews'].sum())
 
         # --- High-Level KPIs ---
         kpi1, kpi2, kpi3 = st.columns(3)
-        kpi1.metric("Total Reviews Analyzed", f"{len(filtered_df):,}")
+        kpi1.metric("Total Reviews Analyzed", f"{total_reviews:,}")
         kpi2.metric("Platform Name", platform)
         kpi3.metric("Engine", "DistilBERT-ML")
 
@@ -120,8 +291,9 @@ elif app_mode == "Data Dashboard":
         with col_left:
             st.subheader("Sentiment Distribution")
             fig = px.pie(
-                filtered_df, 
+                counts, 
                 names='sentiment', 
+                values='reviews', 
                 hole=0.4, 
                 color_discrete_sequence=px.colors.qualitative.Pastel
             )
@@ -130,17 +302,7 @@ elif app_mode == "Data Dashboard":
         with col_right:
             st.subheader("Word Cloud: Trending Keywords")
             
-            # Logic to find the correct text column for the Word Cloud
-            # We look for common review column names used in your preprocessing
-            possible_text_cols = ['cleaned_review', 'Singlish', 'cleaned_text', 'review_body']
-            target_col = next((c for c in possible_text_cols if c in filtered_df.columns), None)
-            
-            if target_col:
-                text_corpus = " ".join(filtered_df[target_col].astype(str))
-            else:
-                # Fallback: Use the column before the last one (usually where the review sits)
-                text_corpus = " ".join(filtered_df.iloc[:, -2].astype(str))
-            
+            text_corpus = word_cloud_corpus(platform, tuple(selected_sentiments), results_store_key())
             if text_corpus.strip() and len(text_corpus) > 10:
                 wc = WordCloud(background_color='white', width=800, height=400, colormap='viridis').generate(text_corpus)
                 plt.figure(figsize=(10, 5))
@@ -150,17 +312,99 @@ elif app_mode == "Data Dashboard":
             else:
                 st.info("No sufficient text data found to generate a Word Cloud.")
 
+        # --- Aspect-Level Pain Points (reads only the precomputed index) ---
+        st.subheader("🎯 Top Negative Aspects")
+        
+        if os.path.exists(INDEX_FILE):
+            aspect_index = load_aspect_index(INDEX_FILE, os.path.getmtime(INDEX_FILE))
+            
+            tab_aspects, tab_phrases, tab_compare = st.tabs(["Aspects", "Phrases", "Cross-Platform Comparison"])
+            
+            with tab_aspects:
+                ranked = top_negative_aspects(aspect_index, platform)
+                if ranked.empty:
+                    st.info(f"No negative aspect mentions indexed for {platform}.")
+                else:
+                    st.dataframe(ranked, use_container_width=True, hide_index=True)
+            
+            with tab_phrases:
+                ranked = top_negative_aspects(aspect_index, platform, kind='ngram')
+                st.dataframe(ranked.head(25), use_container_width=True, hide_index=True)
+            
+            with tab_compare:
+                rates = aspect_negative_rates(aspect_index)
+                fig = px.bar(
+                    rates, 
+                    x='term', 
+                    y='negative_rate', 
+                    color='platform', 
+                    barmode='group',
+                    labels={'term': 'Aspect', 'negative_rate': 'Share of Negative Mentions'},
+                    color_discrete_sequence=px.colors.qualitative.Pastel
+                )
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Aspect index not built yet. Run 'python aspect_index.py' after the analysis scripts.")
+
         # --- Detailed Data View ---
         st.subheader("Raw Analyzed Data Explorer")
-        st.dataframe(filtered_df, use_container_width=True)
+        if total_reviews > EXPLORER_ROWS:
+            st.caption(f"Showing the first {EXPLORER_ROWS:,} of {total_reviews:,} reviews. The export below contains all of them.")
+        st.dataframe(explorer_df, use_container_width=True)
 
         # --- Exporting Results ---
-        csv_binary = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Export Analysis as CSV",
-            data=csv_binary,
-            file_name=f"{platform}_Sentiment_Report.csv",
-            mime='text/csv'
-        )
+        # The full export reads every matching row, so it is only built on request
+        export_request = (platform, tuple(selected_sentiments))
+        if st.button("🧾 Prepare CSV Export"):
+            st.session_state["export_request"] = export_request
+        if st.session_state.get("export_request") == export_request:
+            st.download_button(
+                label="📥 Export Analysis as CSV",
+                data=export_report(platform, tuple(selected_sentiments), results_store_key()),
+                file_name=f"{platform}_Sentiment_Report.csv",
+                mime='text/csv'
+            )
+    else:
+        st.error(f"Dataset for {platform} not found. Ensure the analysis script has been executed.")
+
+# --- MODULE 3: Cross-Platform Comparison ---
+elif app_mode == "Cross-Platform Comparison":
+    st.title("⚖️ Cross-Platform Comparison")
+    st.markdown("Compare sentiment across platforms with a single query over the shared results store.")
+
+    with closing(open_results_store()) as store:
+        stored_platforms = results_store.platforms_in_store(store)
+        if stored_platforms:
+            selected_platforms = st.multiselect("Select Platforms to Compare:", stored_platforms, default=stored_platforms[:2])
+            summary = results_store.cross_platform_summary(store, selected_platforms)
+
+    if stored_platforms:
+
+        if summary.empty:
+            st.info("Select at least one platform to compare.")
+        else:
+            # --- Sentiment Share per Platform ---
+            fig = px.bar(
+                summary, 
+                x='platform', 
+                y='share', 
+                color='sentiment', 
+                text_auto='.0%',
+                labels={'platform': 'Platform', 'share': 'Share of Reviews'},
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+            # --- Comparison Table ---
+            table = summary.pivot_table(index='platform', columns='sentiment', values='reviews', fill_value=0)
+            table['TOTAL'] = table.sum(axis=1)
+            st.dataframe(table, use_container_width=True)
+
+            st.download_button(
+                label="📥 Export Comparison as CSV",
+                data=summary.to_csv(index=False).encode('utf-8'),
+                file_name="Cross_Platform_Sentiment_Report.csv",
+                mime='text/csv'
+            )
     else:
-        st.error(f"Dataset for {platform} not found. Ensure the analysis script has been executed.")
\ No newline at end of file
+        st.error("No analyzed datasets found. Ensure the analysis scripts have been executed.")
\ No newline at end of file
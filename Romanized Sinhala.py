@@ -1,18 +1,22 @@
-import pandas as pd
+import sys
 import re
 from transformers import pipeline
 
+from platforms import output_lock, write_csv_atomic
+from results_store import save_platform_results
+from aspect_index import refresh_platform
+from singlish_loader import load_singlish
+
 # 1. Load the Dataset
 try:
-    # Since this file has no headers, we load it with header=None
-    df = pd.read_csv('Romanized Sinhala.csv', header=None)
-    
-    # We rename the first column (Column 0) to 'Singlish' for easier processing
-    df = df.rename(columns={0: 'Singlish'})
+    # The file is UTF-16 with tab padding; the dedicated loader returns the
+    # 'Singlish' text and its Sinhala-script translation as separate columns
+    df = load_singlish('Romanized Sinhala.csv')
     
-    print("Step 1: File loaded and column renamed successfully!")
+    print(f"Step 1: File loaded successfully! Total rows detected: {len(df)}")
 except Exception as e:
     print(f"Error loading file: {e}")
+    sys.exit(1)
 
 # 2. Data Preprocessing (Cleaning)
 text_column = 'Singlish' 
@@ -68,11 +72,19 @@ if 'df' in locals() and text_column in df.columns:
 
     # Save the processed results to a new CSV file
     output_file = 'Analyzed_Romanized_Sinhala_Final.csv' 
-    df.to_csv(output_file, index=False)
+    with output_lock(output_file):
+        write_csv_atomic(df, output_file)
+
+        # Bulk-insert the results into the shared store read by the dashboard
+        save_platform_results('Romanized Sinhala', df)
+
+        # Replace this platform's rows in the aspect index shown on the dashboard
+        refresh_platform('Romanized Sinhala')
 
     print(f"\n--- Process Completed Successfully! ---")
     print(f"Total rows analyzed: {len(df)}")
     print(f"Final results saved to: {output_file}")
 
 else:
-    print(f"Error: Could not find valid data in 'Romanized Sinhala.csv' to analyze.")
\ No newline at end of file
+    print(f"Error: Could not find valid data in 'Romanized Sinhala.csv' to analyze.")
+    sys.exit(1)
\ No newline at end of file
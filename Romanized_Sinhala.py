@@ -1,21 +1,17 @@
-import pandas as pd
+import sys
 import re
 from transformers import pipeline
 
+from platforms import output_lock, write_csv_atomic
+from results_store import save_platform_results
+from aspect_index import refresh_platform
+from singlish_loader import load_singlish
+
 # 1. Load the Entire Dataset
 try:
-    # Using 'utf-16' and 'on_bad_lines' to ensure all rows are read without crashing
-    df = pd.read_csv(
-        'Romanized Sinhala.csv', 
-        header=None, 
-        encoding='utf-16', 
-        on_bad_lines='skip', 
-        engine='python'
-    )
-    
-    # Select only the first column and rename it
-    df = df[[0]] 
-    df.columns = ['Singlish']
+    # The dedicated loader sniffs the UTF-16 encoding, drops the empty padding
+    # fields while parsing and splits off the Sinhala-script translation
+    df = load_singlish('Romanized Sinhala.csv')
     
     print(f"Step 1: File loaded! Total rows detected: {len(df)}")
 except Exception as e:
@@ -67,8 +63,15 @@ if df is not None:
         
         # Save to CSV
         output_file = 'Analyzed_Romanized_Sinhala_Final.csv' 
-        # 'utf-8-sig' ensures Sinhala characters open correctly in Excel
-        final_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        with output_lock(output_file):
+            # 'utf-8-sig' ensures Sinhala characters open correctly in Excel
+            write_csv_atomic(final_df, output_file, encoding='utf-8-sig')
+
+            # Bulk-insert the results into the shared store read by the dashboard
+            save_platform_results('Romanized Sinhala', final_df)
+
+            # Replace this platform's rows in the aspect index shown on the dashboard
+            refresh_platform('Romanized Sinhala')
 
         print(f"\n--- Success! ---")
         print(f"Total rows analyzed: {len(final_df)}")
@@ -76,5 +79,7 @@ if df is not None:
 
     except Exception as e:
         print(f"\nAI Error: {e}")
+        sys.exit(1)
 else:
-    print("Error: Could not load the data.")
\ No newline at end of file
+    print("Error: Could not load the data.")
+    sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,196 @@
+import os
+import argparse
+from collections import Counter
+import pandas as pd
+
+from platforms import PLATFORMS, clean_text, output_lock, write_csv_atomic
+
+# ---------------------------------------------------------
+# Aspect x sentiment co-occurrence index
+# ---------------------------------------------------------
+# One streaming pass over every analyzed CSV counts, per platform, how many
+# Positive / Neutral / Negative reviews mention each aspect (delivery,
+# packaging, size, price, ...) plus the most frequent bigrams. The dashboard
+# reads only this small index, so pain-point views never rescan review text.
+# Every analysis run refreshes its own platform's rows (refresh_platform);
+# 'python aspect_index.py' rebuilds the whole index.
+
+INDEX_FILE = "aspect_index.csv"
+INDEX_COLUMNS = ['platform', 'kind', 'term', 'sentiment', 'reviews']
+CHUNK_ROWS = 50000
+NGRAM_LIMIT = 200      # Bigrams kept per platform (by total mentions)
+NGRAM_PRUNE = 500000   # Distinct bigram keys held before one-off bigrams are dropped
+
+# Aspect -> English and Singlish terms (single words or two-word phrases)
+ASPECTS = {
+    "Delivery": ['delivery', 'deliver', 'delivered', 'shipping', 'shipment', 'courier', 'arrived',
+                 'late', 'delay', 'delayed', 'tracking', 'parcel', 'awe na', 'awa', 'ewwa', 'genath'],
+    "Packaging": ['packaging', 'package', 'packing', 'packed', 'box', 'wrapped', 'damaged', 'pack eka'],
+    "Size": ['size', 'sizes', 'fit', 'fitting', 'small', 'large', 'tight', 'loose',
+             'size eka', 'podi', 'loku', 'lokui', 'podii'],
+    "Price": ['price', 'prices', 'cheap', 'expensive', 'cost', 'discount', 'offer', 'money',
+              'mila', 'ganan', 'salli', 'ganan wadi'],
+    "Quality": ['quality', 'fake', 'original', 'broken', 'defective', 'material',
+                'quality eka', 'naraka'],
+    "Customer Service": ['service', 'support', 'seller', 'response', 'reply', 'customer care', 'agent'],
+    "Refund & Returns": ['refund', 'return', 'returned', 'cancel', 'cancelled', 'replacement', 'salli aapahu'],
+    "App Experience": ['app', 'update', 'login', 'crash', 'crashes', 'slow', 'bug', 'payment', 'checkout'],
+}
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'is', 'it', 'to', 'of', 'in', 'for', 'on', 'this', 'that', 'i',
+    'my', 'me', 'you', 'was', 'are', 'be', 'with', 'not', 'but', 'so', 'very', 'have', 'has', 'they',
+    'eka', 'ek', 'mama', 'mata', 'oya', 'api', 'ne', 'nam', 'da', 'th', 'thama', 'hari',
+}
+
+TEXT_COLUMNS = ['cleaned_review', 'cleaned_text', 'Singlish', 'content', 'review_body']
+
+# Reverse lookup: term -> aspect
+TERM_TO_ASPECT = {term: aspect for aspect, terms in ASPECTS.items() for term in terms}
+
+
+def review_terms(text):
+    """
+    Unigrams and bigrams of a cleaned review.
+    """
+    words = clean_text(text).split()
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words, bigrams
+
+
+def index_platform(file_path):
+    """
+    Streams one analyzed CSV and returns (aspect_counts, ngram_counts, totals),
+    each keyed by (term, sentiment) / sentiment.
+    """
+    aspect_counts = Counter()
+    ngram_counts = Counter()
+    totals = Counter()
+
+    header = pd.read_csv(file_path, nrows=0).columns
+    text_column = next((c for c in TEXT_COLUMNS if c in header), None)
+    if text_column is None or 'sentiment' not in header:
+        raise KeyError(f"{file_path} needs a review text column and a 'sentiment' column.")
+
+    for chunk in pd.read_csv(file_path, usecols=[text_column, 'sentiment'], chunksize=CHUNK_ROWS):
+        chunk = chunk.dropna(subset=['sentiment'])
+        for text, sentiment in zip(chunk[text_column].astype(str), chunk['sentiment'].str.upper()):
+            totals[sentiment] += 1
+            words, bigrams = review_terms(text)
+
+            # A review counts once per aspect, however many of its terms it uses
+            aspects = {TERM_TO_ASPECT[t] for t in words + bigrams if t in TERM_TO_ASPECT}
+            for aspect in aspects:
+                aspect_counts[(aspect, sentiment)] += 1
+
+            for bigram in set(bigrams):
+                a, b = bigram.split(' ')
+                if a not in STOPWORDS or b not in STOPWORDS:
+                    ngram_counts[(bigram, sentiment)] += 1
+
+        # Bound memory on very large dumps: bigrams seen once are never top-ranked
+        if len(ngram_counts) > NGRAM_PRUNE:
+            ngram_counts = Counter({key: count for key, count in ngram_counts.items() if count > 1})
+
+    # Keep only the most mentioned bigrams so the index stays compact
+    bigram_totals = Counter()
+    for (bigram, _), count in ngram_counts.items():
+        bigram_totals[bigram] += count
+    top_bigrams = {bigram for bigram, _ in bigram_totals.most_common(NGRAM_LIMIT)}
+    ngram_counts = Counter({key: count for key, count in ngram_counts.items() if key[0] in top_bigrams})
+
+    return aspect_counts, ngram_counts, totals
+
+
+def platform_rows(platform):
+    """
+    Index rows (platform, kind, term, sentiment, reviews) of one analyzed platform CSV.
+    """
+    aspect_counts, ngram_counts, totals = index_platform(PLATFORMS[platform]["output"])
+    rows = [(platform, 'aspect', term, sentiment, count) for (term, sentiment), count in aspect_counts.items()]
+    rows += [(platform, 'ngram', term, sentiment, count) for (term, sentiment), count in ngram_counts.items()]
+    rows += [(platform, 'total', '', sentiment, count) for sentiment, count in totals.items()]
+    return rows
+
+
+def build_aspect_index(output_file=INDEX_FILE):
+    """
+    Indexes every analyzed platform CSV that exists and writes one long-format
+    table: platform, kind ('aspect' / 'ngram' / 'total'), term, sentiment, reviews.
+    """
+    with output_lock(output_file):
+        rows = []
+        for platform, config in PLATFORMS.items():
+            if not os.path.exists(config["output"]):
+                continue
+            print(f"Indexing {platform}...")
+            rows += platform_rows(platform)
+
+        index = pd.DataFrame(rows, columns=INDEX_COLUMNS)
+        write_csv_atomic(index, output_file)
+    return index
+
+
+def refresh_platform(platform, output_file=INDEX_FILE):
+    """
+    Re-indexes one platform at the end of its analysis run and replaces only
+    its rows, so the dashboard never shows pain points of an older run.
+    Builds the whole index if it does not exist yet.
+    """
+    if not os.path.exists(output_file):
+        return build_aspect_index(output_file)
+
+    with output_lock(output_file):
+        # keep_default_na: terms such as 'null' or 'na' must survive the round trip
+        index = pd.read_csv(output_file, keep_default_na=False)
+        index = pd.concat([
+            index[index['platform'] != platform],
+            pd.DataFrame(platform_rows(platform), columns=INDEX_COLUMNS)
+        ], ignore_index=True)
+        write_csv_atomic(index, output_file)
+    return index
+
+
+def top_negative_aspects(index, platform, kind='aspect'):
+    """
+    Ranks the aspects (or bigrams) of one platform by negative mentions.
+    """
+    subset = index[(index['platform'] == platform) & (index['kind'] == kind)]
+    if subset.empty:
+        return pd.DataFrame(columns=['term', 'mentions', 'negative', 'negative_rate'])
+    table = subset.pivot_table(index='term', columns='sentiment', values='reviews', aggfunc='sum', fill_value=0)
+    negative = table['NEGATIVE'] if 'NEGATIVE' in table else 0
+    ranked = pd.DataFrame({
+        'mentions': table.sum(axis=1),
+        'negative': negative,
+    })
+    ranked['negative_rate'] = ranked['negative'] / ranked['mentions']
+    ranked = ranked[ranked['negative'] > 0].sort_values(['negative', 'negative_rate'], ascending=False)
+    return ranked.reset_index()
+
+
+def aspect_negative_rates(index):
+    """
+    Negative share of every aspect on every platform, for cross-platform comparison.
+    """
+    subset = index[index['kind'] == 'aspect']
+    mentions = subset.groupby(['platform', 'term'])['reviews'].sum()
+    negative = subset[subset['sentiment'] == 'NEGATIVE'].groupby(['platform', 'term'])['reviews'].sum()
+    rates = (negative.reindex(mentions.index, fill_value=0) / mentions).rename('negative_rate')
+    return rates.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the aspect x sentiment index for the dashboard.")
+    parser.add_argument("--output", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    index = build_aspect_index(args.output)
+    print(f"\n--- Aspect Index Completed! ---")
+    print(f"Platforms indexed: {index['platform'].nunique()}")
+    print(f"Index rows: {len(index)}")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import time
+import uuid
+import shutil
+import threading
+import pandas as pd
+
+# ---------------------------------------------------------
+# Background bulk scoring of uploaded CSV files
+# ---------------------------------------------------------
+# The uploaded file is copied to disk once and then read back in chunks, so a
+# large upload is never held as a whole DataFrame. Each job runs in its own
+# thread, appends scored rows to its result CSV after every chunk and checks
+# its cancel flag between batches; the Streamlit script thread only reads the
+# job's progress fields.
+
+UPLOAD_DIR = "uploads"
+CHUNK_ROWS = 2000    # Rows read from disk at a time
+BATCH_SIZE = 32      # Reviews sent to the model per call
+MAX_AGE = 24 * 3600  # Seconds finished jobs and unused files are kept in the uploads folder
+
+
+class BulkScoringJob:
+    """
+    Scores one column of an uploaded CSV in a background thread.
+    score_batch(texts) must return a list of (label, confidence) tuples.
+    """
+
+    def __init__(self, source_path, file_name, text_column, score_batch):
+        self.id = uuid.uuid4().hex[:8]
+        self.source_path = source_path
+        self.file_name = file_name
+        self.text_column = text_column
+        self.result_path = os.path.join(UPLOAD_DIR, f"{self.id}_scored.csv")
+        self.score_batch = score_batch
+
+        self.status = "queued"      # queued -> running -> done / cancelled / failed
+        self.total_rows = None
+        self.rows_done = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def progress(self):
+        if not self.total_rows:
+            return 0.0
+        return min(self.rows_done / self.total_rows, 1.0)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "cancelled", "failed")
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def discard(self):
+        """
+        Deletes the result file of a finished job.
+        """
+        if self.finished and os.path.exists(self.result_path):
+            os.remove(self.result_path)
+
+    def _chunks(self):
+        return pd.read_csv(self.source_path, usecols=[self.text_column], chunksize=CHUNK_ROWS)
+
+    def _run(self):
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            # Counting rows is cheap next to inference and gives an exact progress bar
+            self.total_rows = sum(len(chunk) for chunk in self._chunks())
+
+            header = True
+            for chunk in pd.read_csv(self.source_path, chunksize=CHUNK_ROWS):
+                texts = chunk[self.text_column].fillna("").astype(str).tolist()
+                labels, scores = [], []
+                for start in range(0, len(texts), BATCH_SIZE):
+                    if self._cancel.is_set():
+                        break
+                    for label, score in self.score_batch(texts[start:start + BATCH_SIZE]):
+                        labels.append(label)
+                        scores.append(score)
+
+                # Write whatever was scored (all of it unless cancelled mid-chunk), then count it,
+                # so the progress bar always matches the rows in the result file
+                if labels:
+                    scored = chunk.iloc[:len(labels)].copy()
+                    scored['sentiment'] = labels
+                    scored['confidence'] = scores
+                    scored.to_csv(self.result_path, mode='a', header=header, index=False)
+                    header = False
+                    self.rows_done += len(labels)
+
+                if self._cancel.is_set():
+                    self.status = "cancelled"
+                    return
+
+            self.status = "done"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+
+
+def save_upload(uploaded_file):
+    """
+    Copies a Streamlit UploadedFile to the uploads folder in fixed-size blocks.
+    Returns the path on disk.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex[:8]}_{os.path.basename(uploaded_file.name)}")
+    uploaded_file.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
+    return path
+
+
+def csv_columns(path):
+    """
+    Header of a CSV file without loading any rows.
+    """
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def cleanup_uploads(jobs, max_age=MAX_AGE):
+    """
+    Forgets finished jobs older than max_age and deletes every file in the
+    uploads folder that no remaining job uses and that is older than max_age.
+    """
+    now = time.time()
+    for job_id, job in list(jobs.items()):
+        if job.finished and now - job.finished_at > max_age:
+            job.discard()
+            del jobs[job_id]
+
+    in_use = set()
+    for job in jobs.values():
+        in_use.add(os.path.abspath(job.result_path))
+        if not job.finished:
+            in_use.add(os.path.abspath(job.source_path))
+
+    if not os.path.isdir(UPLOAD_DIR):
+        return
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.abspath(os.path.join(UPLOAD_DIR, name))
+        try:
+            if path not in in_use and now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+        except OSError:
+            # Removed by another session in the meantime
+            pass
@@ -1,7 +1,12 @@
+import sys
 import pandas as pd
 import re
 from transformers import pipeline
 
+from platforms import output_lock, write_csv_atomic
+from results_store import save_platform_results
+from aspect_index import refresh_platform
+
 # 1. Load the Dataset
 try:
     # Loading the 'converted_data.csv' file
@@ -9,6 +14,7 @@ try:
     print("Step 1: File loaded successfully!")
 except Exception as e:
     print(f"Error loading file: {e}")
+    sys.exit(1)
 
 # 2. Data Preprocessing (Cleaning)
 # Selecting the 'Singlish' column for analysis
@@ -66,7 +72,14 @@ if 'df' in locals() and text_column in df.columns:
 
     # Save final results to a new CSV file
     output_file = 'Analyzed_Converted_Data_Final.csv' 
-    df.to_csv(output_file, index=False)
+    with output_lock(output_file):
+        write_csv_atomic(df, output_file)
+
+        # Bulk-insert the results into the shared store read by the dashboard
+        save_platform_results('Converted Data', df)
+
+        # Replace this platform's rows in the aspect index shown on the dashboard
+        refresh_platform('Converted Data')
 
     print(f"\n--- Process Completed Successfully! ---")
     print(f"Total rows analyzed: {len(df)}")
@@ -74,4 +87,5 @@ if 'df' in locals() and text_column in df.columns:
 
 else:
     if 'df' in locals():
-        print(f"Error: Column '{text_column}' not found. Available columns: {list(df.columns)}")
\ No newline at end of file
+        print(f"Error: Column '{text_column}' not found. Available columns: {list(df.columns)}")
+    sys.exit(1)
\ No newline at end of file
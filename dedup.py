@@ -0,0 +1,175 @@
+import re
+import time
+import zlib
+import argparse
+import numpy as np
+from transformers import pipeline
+
+from platforms import PLATFORMS, MODEL_NAME, normalize_label, load_platform_reviews, output_lock, write_platform_output
+from results_store import save_platform_results
+from aspect_index import refresh_platform
+
+# ---------------------------------------------------------
+# Near-duplicate clustering before sentiment scoring
+# ---------------------------------------------------------
+# Review dumps (the Singlish data especially) repeat the same review with
+# elongations ("Wooooow"), punctuation runs ("?????") and different casing.
+# Reviews are normalized, hashed with MinHash and grouped with LSH banding in
+# roughly linear time; only one representative per cluster goes to the model
+# and its label is fanned back out to every member.
+
+NUM_PERM = 64          # MinHash permutations (= BANDS * ROWS_PER_BAND)
+BANDS = 16
+ROWS_PER_BAND = 4
+SHINGLE_SIZE = 3       # Character n-grams; short reviews have too few words
+THRESHOLD = 0.8        # Minimum estimated Jaccard similarity to merge two reviews
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def normalize_for_dedup(text):
+    """
+    Shortens elongations of 3+ repeated letters to two ('wooooow' -> 'woow',
+    'yakooo' -> 'yakoo') on top of clean_text. Regular doubles ('good', 'yakoo')
+    and digits ('1000') are left alone; MinHash catches the remaining near-matches.
+    Punctuation runs and casing are already removed by clean_text.
+    """
+    return re.sub(r'([^\W\d_])\1{2,}', r'\1\1', str(text))
+
+
+def shingles(text):
+    """
+    Character n-gram set of a normalized review, hashed to 32-bit integers.
+    """
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode('utf-8'))
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signatures(texts, seed=42):
+    """
+    Returns a (len(texts), NUM_PERM) array of MinHash signatures.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(MERSENNE_PRIME), size=NUM_PERM, dtype=np.uint64)
+    b = rng.integers(0, int(MERSENNE_PRIME), size=NUM_PERM, dtype=np.uint64)
+
+    signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint64)
+    for row, text in enumerate(texts):
+        hashes = np.fromiter(shingles(text), dtype=np.uint64)
+        # (a * x + b) mod p for every permutation at once; uint64 overflow keeps it a valid hash family
+        permuted = (np.outer(hashes, a) + b) % MERSENNE_PRIME
+        signatures[row] = permuted.min(axis=0)
+    return signatures
+
+
+def cluster_reviews(texts, threshold=THRESHOLD):
+    """
+    Groups near-identical normalized reviews. Returns one cluster ID per review;
+    the cluster ID is the row index of the cluster representative.
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Exact duplicates after normalization are merged without hashing
+    first_seen = {}
+    unique_rows = []
+    for i, text in enumerate(texts):
+        if text in first_seen:
+            parent[i] = first_seen[text]
+        else:
+            first_seen[text] = i
+            unique_rows.append(i)
+
+    signatures = minhash_signatures([texts[i] for i in unique_rows])
+
+    # LSH banding: reviews sharing any identical band become candidate pairs
+    for band in range(BANDS):
+        buckets = {}
+        columns = slice(band * ROWS_PER_BAND, (band + 1) * ROWS_PER_BAND)
+        for position, row in enumerate(unique_rows):
+            key = signatures[position, columns].tobytes()
+            if key not in buckets:
+                buckets[key] = position
+                continue
+            other = buckets[key]
+            similarity = np.mean(signatures[position] == signatures[other])
+            if similarity >= threshold:
+                root_a, root_b = find(row), find(unique_rows[other])
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    return [find(i) for i in range(len(texts))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score one representative per near-duplicate cluster.")
+    parser.add_argument("platform", choices=list(PLATFORMS.keys()))
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--verify-sample", type=int, default=200,
+                        help="Non-representative members scored individually to measure label agreement")
+    args = parser.parse_args()
+
+    # 1. Load and normalize
+    df = load_platform_reviews(args.platform)
+    normalized = [normalize_for_dedup(text) for text in df['cleaned_text']]
+    print(f"Step 1: Loaded {len(df)} reviews.")
+
+    # 2. Cluster near-duplicates
+    start = time.perf_counter()
+    df['cluster_id'] = cluster_reviews(normalized, args.threshold)
+    representatives = df['cluster_id'].unique()
+    print(f"Step 2: {len(representatives)} clusters found in {time.perf_counter() - start:.1f}s.")
+
+    # 3. Score only the representatives
+    print("Step 3: Initializing Lightweight AI Model... Please wait.")
+    sentiment_analyzer = pipeline("sentiment-analysis", model=MODEL_NAME)
+
+    def score(rows):
+        texts = [str(text)[:512] for text in df.loc[rows, 'cleaned_text']]
+        results = sentiment_analyzer(texts, batch_size=args.batch_size, truncation=True)
+        return [normalize_label(result['label']) for result in results]
+
+    start = time.perf_counter()
+    cluster_labels = dict(zip(representatives, score(list(representatives))))
+    df['sentiment'] = df['cluster_id'].map(cluster_labels)
+    print(f"Step 3: Scored representatives in {time.perf_counter() - start:.1f}s.")
+
+    # 4. Label agreement on a sample of fanned-out members
+    members = df.index[df.index.to_numpy() != df['cluster_id'].to_numpy()]
+    sample_size = min(args.verify_sample, len(members))
+    agreement = None
+    if sample_size:
+        sample = np.random.default_rng(0).choice(members, size=sample_size, replace=False)
+        direct = score(list(sample))
+        agreement = np.mean([label == fanned for label, fanned in zip(direct, df.loc[sample, 'sentiment'])])
+
+    # 5. Save and report
+    # Same file and columns as the platform script; cluster IDs are only used for the report
+    output_file = PLATFORMS[args.platform]["output"]
+    with output_lock(output_file):
+        output = write_platform_output(args.platform, df.drop(columns=['cluster_id']))
+        save_platform_results(args.platform, output)
+        refresh_platform(args.platform)
+
+    print(f"\n--- Deduplication Report ({args.platform}) ---")
+    print(f"Reviews:            {len(df)}")
+    print(f"Clusters scored:    {len(representatives)}")
+    print(f"Compression ratio:  {len(df) / max(len(representatives), 1):.2f}x")
+    if agreement is not None:
+        print(f"Label agreement:    {agreement:.1%} on {sample_size} sampled members")
+    else:
+        print("Label agreement:    n/a (no duplicate members)")
+    print(f"Results saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import json
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from platforms import MODEL_NAME
+
+# ---------------------------------------------------------
+# Shared local inference worker
+# ---------------------------------------------------------
+# One process holds the DistilBERT weights and the torch runtime; every
+# Streamlit replica on the host sends its reviews here over HTTP instead of
+# loading its own copy of the model. Replicas pick the worker up through the
+# SENTIMENT_WORKER_URL environment variable, e.g.
+#
+#   python inference_worker.py --port 8600
+#   SENTIMENT_WORKER_URL=http://127.0.0.1:8600 streamlit run Dashboard.py --server.port 8501
+#   SENTIMENT_WORKER_URL=http://127.0.0.1:8600 streamlit run Dashboard.py --server.port 8502
+
+WORKER_URL_ENV = "SENTIMENT_WORKER_URL"
+DEFAULT_PORT = 8600
+
+
+class RemoteSentimentAnalyzer:
+    """
+    Drop-in replacement for the transformers pipeline used by Dashboard.py:
+    analyzer(text) and analyzer([texts]) return the same list of {'label', 'score'} dicts.
+    """
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def __call__(self, texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        request = urllib.request.Request(
+            f"{self.url}/predict",
+            data=json.dumps({"texts": list(texts)}).encode('utf-8'),
+            headers={"Content-Type": "application/json"}
+        )
+        # Errors surface as OSError so callers handle "worker down" and "worker failed" alike
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))["results"]
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8'))["error"]
+            except (ValueError, KeyError):
+                message = str(e)
+            raise OSError(f"Inference worker at {self.url} failed: {message}") from e
+        except urllib.error.URLError as e:
+            raise OSError(f"Inference worker at {self.url} is unreachable: {e.reason}") from e
+
+
+def remote_analyzer_from_env():
+    """
+    Returns a RemoteSentimentAnalyzer when SENTIMENT_WORKER_URL is set, otherwise None.
+    """
+    url = os.environ.get(WORKER_URL_ENV, "").strip()
+    return RemoteSentimentAnalyzer(url) if url else None
+
+
+def make_handler(analyzer, batch_size):
+    # The pipeline is not thread-safe; requests are served one batch at a time
+    lock = threading.Lock()
+
+    class PredictHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "model": MODEL_NAME})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                texts = json.loads(self.rfile.read(length).decode('utf-8'))["texts"]
+                texts = [str(text)[:512] for text in texts]
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": f"Invalid request: {e}"})
+                return
+
+            try:
+                with lock:
+                    results = analyzer(texts, batch_size=batch_size, truncation=True) if texts else []
+            except Exception as e:
+                self._send(500, {"error": f"Inference failed: {e}"})
+                return
+            self._send(200, {"results": [
+                {"label": result["label"], "score": float(result["score"])} for result in results
+            ]})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep the console quiet; one line per request is too noisy for dashboard traffic
+            pass
+
+    return PredictHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the sentiment model to all local Streamlit replicas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    from transformers import pipeline
+
+    print("Step 1: Loading the shared DistilBERT model... Please wait.")
+    analyzer = pipeline("sentiment-analysis", model=MODEL_NAME)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(analyzer, args.batch_size))
+    print(f"Step 2: Inference worker listening on http://{args.host}:{args.port}")
+    print(f"Start replicas with {WORKER_URL_ENV}=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import os
+import sys
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import subprocess
+
+from platforms import PLATFORMS
+
+# ---------------------------------------------------------
+# Persistent job queue for platform refresh runs
+# ---------------------------------------------------------
+# Jobs live in a local SQLite file, so the queue survives restarts and can be
+# filled from the command line while a worker pool drains it:
+#
+#   python job_queue.py enqueue Shein Walmart --priority 5
+#   python job_queue.py worker --threads-per-job 2
+#   python job_queue.py status
+#
+# Each job runs the platform's own script. A job only starts once it holds the
+# lock on its output CSV (a row in the 'locks' table), so two refreshes of the
+# same platform never overlap in the pool. The scripts also hold a file lock
+# on the output while writing it (platforms.output_lock), which covers runs
+# started by hand, and swap the finished file in with os.replace.
+
+DB_FILE = "jobs.db"
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30        # Seconds before the first retry; doubles on every attempt
+HEARTBEAT = 10          # Seconds between liveness updates of a running job
+STALE_AFTER = 120       # A running job without heartbeat for this long is requeued
+POLL_INTERVAL = 2       # Seconds an idle worker waits before checking the queue again
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (status, priority DESC, available_at, id);
+CREATE TABLE IF NOT EXISTS locks (
+    path TEXT PRIMARY KEY,
+    job_id INTEGER NOT NULL,
+    acquired_at REAL NOT NULL
+);
+"""
+
+
+def connect(db_file=DB_FILE):
+    """
+    Opens the queue database; WAL mode lets the dashboard read while workers write.
+    """
+    conn = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue(conn, platform, priority=0, max_attempts=MAX_ATTEMPTS):
+    """
+    Adds a refresh job for a platform. A platform that already has a queued job
+    is not queued twice; its priority is raised instead.
+    """
+    if platform not in PLATFORMS:
+        raise KeyError(f"Unknown platform '{platform}'. Choose from: {list(PLATFORMS.keys())}")
+
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE platform = ? AND status = 'queued'", (platform,)
+        ).fetchone()
+        if row is not None:
+            conn.execute("UPDATE jobs SET priority = MAX(priority, ?) WHERE id = ?", (priority, row["id"]))
+            job_id = row["id"]
+        else:
+            job_id = conn.execute(
+                "INSERT INTO jobs (platform, priority, max_attempts, available_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (platform, priority, max_attempts, now, now)
+            ).lastrowid
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return job_id
+
+
+def claim_next(conn, worker):
+    """
+    Atomically picks the highest-priority runnable job whose output file is not
+    locked, takes the lock and marks the job running. Returns the job row or None.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        candidates = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' AND available_at <= ? "
+            "ORDER BY priority DESC, available_at, id",
+            (now,)
+        ).fetchall()
+        locked = {row["path"] for row in conn.execute("SELECT path FROM locks")}
+
+        for job in candidates:
+            output = PLATFORMS[job["platform"]]["output"]
+            if output in locked:
+                continue
+            conn.execute("INSERT INTO locks (path, job_id, acquired_at) VALUES (?, ?, ?)", (output, job["id"], now))
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                "heartbeat_at = ?, worker = ?, error = NULL WHERE id = ?",
+                (now, now, worker, job["id"])
+            )
+            conn.execute("COMMIT")
+            return conn.execute("SELECT * FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+
+        conn.execute("COMMIT")
+        return None
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _settle(conn, job, error, now):
+    """
+    Records the result of a job inside an open transaction. Failed jobs are
+    requeued with exponential backoff until they run out of attempts; if the
+    platform was queued again meanwhile, the retry is merged into that job instead.
+    """
+    conn.execute("DELETE FROM locks WHERE job_id = ?", (job["id"],))
+    if error is None:
+        conn.execute("UPDATE jobs SET status = 'done', finished_at = ? WHERE id = ?", (now, job["id"]))
+    elif job["attempts"] < job["max_attempts"]:
+        queued = conn.execute(
+            "SELECT id FROM jobs WHERE platform = ? AND status = 'queued' AND id != ?",
+            (job["platform"], job["id"])
+        ).fetchone()
+        if queued is not None:
+            # Keep one queued job per platform, with the higher of the two priorities
+            conn.execute(
+                "UPDATE jobs SET priority = MAX(priority, ?) WHERE id = ?", (job["priority"], queued["id"])
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                (now, f"{error}\n(retry merged into job {queued['id']})", job["id"])
+            )
+        else:
+            delay = RETRY_DELAY * 2 ** (job["attempts"] - 1)
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, error = ? WHERE id = ?",
+                (now + delay, error, job["id"])
+            )
+    else:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+            (now, error, job["id"])
+        )
+
+
+def finish(conn, job, error=None):
+    """
+    Releases the output lock and records the result (see _settle for retries).
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _settle(conn, job, error, time.time())
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def requeue_stale(conn):
+    """
+    Settles jobs whose worker died (no heartbeat for STALE_AFTER seconds) as a
+    failed attempt, so they are retried, merged or given up like any other failure.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        stale = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'running' AND heartbeat_at < ?", (now - STALE_AFTER,)
+        ).fetchall()
+        for job in stale:
+            _settle(conn, job, "worker lost", now)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return len(stale)
+
+
+def job_status(conn, limit=20):
+    """
+    Latest jobs, newest first, for the CLI and the dashboard sidebar.
+    """
+    return conn.execute(
+        "SELECT id, platform, priority, status, attempts, max_attempts, created_at, finished_at, error "
+        "FROM jobs ORDER BY id DESC LIMIT ?",
+        (limit,)
+    ).fetchall()
+
+
+def run_job(conn, job, threads_per_job):
+    """
+    Runs the platform script in a child process with a capped thread count,
+    updating the job's heartbeat while it works. Returns an error string or None.
+    """
+    env = dict(os.environ)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        env[var] = str(threads_per_job)
+
+    # Own session: Ctrl+C in the pool's terminal must not interrupt running scripts
+    process = subprocess.Popen(
+        [sys.executable, PLATFORMS[job["platform"]]["script"]],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        start_new_session=True
+    )
+    output = []
+    reader = threading.Thread(target=lambda: output.extend(process.stdout), daemon=True)
+    reader.start()
+
+    while True:
+        try:
+            process.wait(timeout=HEARTBEAT)
+            break
+        except subprocess.TimeoutExpired:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job["id"]))
+    reader.join()
+
+    # The platform scripts exit with a non-zero code on every error path
+    log = "".join(output)
+    if process.returncode != 0:
+        return f"Exit code {process.returncode}: {log[-500:]}"
+    return None
+
+
+def worker_loop(worker, threads_per_job, stop):
+    conn = connect()
+    while not stop.is_set():
+        job = claim_next(conn, worker)
+        if job is None:
+            stop.wait(POLL_INTERVAL)
+            continue
+        print(f"[{worker}] Job {job['id']}: refreshing {job['platform']} (attempt {job['attempts']})")
+        try:
+            error = run_job(conn, job, threads_per_job)
+        except Exception as e:
+            error = str(e)
+        finish(conn, job, error)
+        print(f"[{worker}] Job {job['id']}: {'done' if error is None else 'failed - ' + error.splitlines()[-1]}")
+
+
+def run_pool(workers, threads_per_job):
+    """
+    Drains the queue with a fixed number of worker threads until interrupted.
+    """
+    conn = connect()
+    requeued = requeue_stale(conn)
+    if requeued:
+        print(f"Recovered {requeued} job(s) left running by a previous pool (retried or failed).")
+
+    stop = threading.Event()
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=worker_loop, args=(f"{host}/w{i}", threads_per_job, stop), daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"Worker pool started: {workers} worker(s) x {threads_per_job} thread(s). Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(STALE_AFTER / 2)
+            requeue_stale(conn)
+    except KeyboardInterrupt:
+        print("Stopping after the running jobs finish...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue and run platform refresh jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_cmd = commands.add_parser("enqueue", help="Queue refresh jobs")
+    enqueue_cmd.add_argument("platforms", nargs="*", help="Platforms to refresh (default: all)")
+    enqueue_cmd.add_argument("--priority", type=int, default=0)
+    enqueue_cmd.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+
+    worker_cmd = commands.add_parser("worker", help="Run the worker pool")
+    worker_cmd.add_argument("--threads-per-job", type=int, default=2)
+    worker_cmd.add_argument("--workers", type=int, default=None,
+                            help="Concurrent jobs (default: CPU cores / threads per job)")
+
+    commands.add_parser("status", help="Show the latest jobs")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        conn = connect()
+        for platform in args.platforms or list(PLATFORMS.keys()):
+            job_id = enqueue(conn, platform, args.priority, args.max_attempts)
+            print(f"Queued job {job_id}: {platform} (priority {args.priority})")
+
+    elif args.command == "worker":
+        workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads_per_job)
+        run_pool(workers, args.threads_per_job)
+
+    else:
+        for row in job_status(connect()):
+            print(f"{row['id']:>5}  {row['platform']:<20}{row['status']:<10}"
+                  f"attempt {row['attempts']}/{row['max_attempts']}  {row['error'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
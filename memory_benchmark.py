@@ -0,0 +1,97 @@
+import sys
+import time
+import argparse
+import subprocess
+import urllib.request
+
+from inference_worker import DEFAULT_PORT
+
+# ---------------------------------------------------------
+# Per-replica memory: in-process model vs shared inference worker
+# ---------------------------------------------------------
+# Each measurement runs in a fresh Python process that imports the same
+# libraries as Dashboard.py, runs one prediction and reports its resident
+# set size (RSS) from /proc (Linux only).
+
+REPLICA_IMPORTS = "import streamlit, pandas, plotly.express, wordcloud, matplotlib.pyplot"
+
+IN_PROCESS = REPLICA_IMPORTS + """
+from transformers import pipeline
+from platforms import MODEL_NAME
+analyzer = pipeline("sentiment-analysis", model=MODEL_NAME)
+analyzer("Delivery eka niyamai, thanks!")
+"""
+
+REMOTE = REPLICA_IMPORTS + """
+from inference_worker import RemoteSentimentAnalyzer
+analyzer = RemoteSentimentAnalyzer("{url}")
+analyzer("Delivery eka niyamai, thanks!")
+"""
+
+REPORT_RSS = """
+with open("/proc/self/status") as f:
+    print(next(line.split()[1] for line in f if line.startswith("VmRSS:")))
+"""
+
+
+def rss_mb_of_snippet(code):
+    """
+    Runs a snippet in a new interpreter and returns its RSS in MB.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", code + REPORT_RSS],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return int(output.strip().splitlines()[-1]) / 1024
+
+
+def rss_mb_of_pid(pid):
+    with open(f"/proc/{pid}/status") as f:
+        return int(next(line.split()[1] for line in f if line.startswith("VmRSS:"))) / 1024
+
+
+def wait_for_worker(url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(1)
+    raise TimeoutError(f"Inference worker at {url} did not start within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Streamlit replica memory before and after the shared worker.")
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    url = f"http://127.0.0.1:{args.port}"
+
+    print("Step 1: Measuring a replica that loads its own model...")
+    in_process = rss_mb_of_snippet(IN_PROCESS)
+
+    print("Step 2: Starting the shared inference worker...")
+    worker = subprocess.Popen([sys.executable, "inference_worker.py", "--port", str(args.port)])
+    try:
+        wait_for_worker(url)
+        print("Step 3: Measuring a replica that calls the shared worker...")
+        remote = rss_mb_of_snippet(REMOTE.format(url=url))
+        worker_rss = rss_mb_of_pid(worker.pid)
+    finally:
+        worker.terminate()
+        worker.wait()
+
+    before = in_process * args.replicas
+    after = remote * args.replicas + worker_rss
+
+    print(f"\n--- Memory Report ({args.replicas} replicas) ---")
+    print(f"{'Mode':<28}{'Per replica':>14}{'Host total':>14}")
+    print(f"{'In-process model (before)':<28}{in_process:>11.0f} MB{before:>11.0f} MB")
+    print(f"{'Shared worker (after)':<28}{remote:>11.0f} MB{after:>11.0f} MB")
+    print(f"Worker process RSS: {worker_rss:.0f} MB")
+    print(f"Per-replica reduction: {1 - remote / in_process:.0%}")
+
+
+if __name__ == "__main__":
+    main()
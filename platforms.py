@@ -0,0 +1,205 @@
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ---------------------------------------------------------
+# Shared registry of the analyzed e-commerce datasets
+# ---------------------------------------------------------
+# Keeps the source CSV, text column and output file (name, columns, encoding)
+# of every platform in one place so the batch tools agree with Dashboard.py
+# and the platform scripts.
+
+MODEL_NAME = "lxyuan/distilbert-base-multilingual-cased-sentiments-student"
+
+# Bump whenever load_platform_reviews() or clean_text() change what the model
+# sees, so caches built from the previous output are rebuilt (2: singlish_loader)
+LOADER_VERSION = 2
+
+PLATFORMS = {
+    "Alibaba": {
+        "script": "Alibaba.py",
+        "source": "Alibaba.csv",
+        "text_column": "content",
+        "cleaned_column": "cleaned_review",
+        "output": "Analyzed_Alibaba_Final.csv",
+    },
+    "Walmart": {
+        "script": "Walmart.py",
+        "source": "Walmart.csv",
+        "text_column": "content",
+        "cleaned_column": "cleaned_review",
+        "output": "Analyzed_Walmart_Final.csv",
+    },
+    "Shein": {
+        "script": "Shein.py",
+        "source": "Shein.csv",
+        "text_column": "content",
+        "cleaned_column": "cleaned_review",
+        "output": "Analyzed_Shein_Final.csv",
+    },
+    "Amazon": {
+        "script": "Amazon_shopping.py",
+        "source": "Amazon shopping.csv",
+        "text_column": "content",
+        "cleaned_column": "cleaned_review",
+        "output": "Analyzed_Amazon shopping_Final.csv",
+    },
+    "AliExpress": {
+        "script": "Aliexpress.py",
+        "source": "Aliexpress.csv",
+        "text_column": "content",
+        "cleaned_column": "cleaned_review",
+        "output": "Analyzed_Aliexpress_Final.csv",
+    },
+    "Daraz": {
+        "script": "Daraz_Online_Shopping_App.py",
+        "source": "Daraz online shopping App.csv",
+        "text_column": "content",
+        "cleaned_column": "cleaned_review",
+        "output": "Analyzed_Daraz online shopping App_Final.csv",
+    },
+    "Romanized Sinhala": {
+        "script": "Romanized_Sinhala.py",
+        "source": "Romanized Sinhala.csv",
+        "text_column": "Singlish",
+        "cleaned_column": "cleaned_text",
+        "output": "Analyzed_Romanized_Sinhala_Final.csv",
+        # Romanized_Sinhala.py keeps only the review and its label, as UTF-8 with BOM for Excel
+        "output_columns": ["Singlish", "sentiment"],
+        "output_encoding": "utf-8-sig",
+    },
+    "Converted Data": {
+        "script": "converted_data.py",
+        "source": "converted_data.csv",
+        "text_column": "Singlish",
+        "cleaned_column": "cleaned_text",
+        "output": "Analyzed_Converted_Data_Final.csv",
+    },
+}
+
+
+def platform_slug(platform):
+    """
+    File-system friendly name for a platform (e.g. 'Romanized Sinhala' -> 'romanized_sinhala').
+    """
+    return re.sub(r'[^a-z0-9]+', '_', platform.lower()).strip('_')
+
+
+def clean_text(text):
+    """
+    Same cleaning rules as the platform scripts: lowercase, drop links,
+    keep English and Sinhala characters and collapse whitespace.
+    """
+    text = str(text).lower()
+    text = re.sub(r'http\S+', '', text)
+    text = re.sub(r'[^\w\s\u0D80-\u0DFF]', '', text)
+    text = " ".join(text.split())
+    return text
+
+
+def normalize_label(label):
+    """
+    Maps the raw DistilBERT labels onto the 'Positive' / 'Neutral' / 'Negative' values stored in the CSVs.
+    """
+    label = str(label).lower()
+    if 'negative' in label:
+        return "Negative"
+    elif 'neutral' in label:
+        return "Neutral"
+    else:
+        return "Positive"
+
+
+def load_platform_reviews(platform):
+    """
+    Loads the raw reviews of a platform exactly like its script does and
+    adds the 'cleaned_text' column used for inference.
+    """
+    config = PLATFORMS[platform]
+    text_column = config["text_column"]
+
+    if platform == "Romanized Sinhala":
+        # UTF-16, tab-padded file without headers; see singlish_loader.py
+        from singlish_loader import load_singlish
+        df = load_singlish(config["source"])
+    else:
+        df = pd.read_csv(config["source"])
+
+    if text_column not in df.columns:
+        raise KeyError(f"Column '{text_column}' not found. Available columns: {list(df.columns)}")
+
+    df = df.dropna(subset=[text_column]).reset_index(drop=True)
+    df['cleaned_text'] = df[text_column].apply(clean_text)
+    return df
+
+
+@contextmanager
+def output_lock(output_file):
+    """
+    Exclusive lock on '<output_file>.lock', held by every writer of a results
+    file (platform scripts, dedup.py, token_cache.py, aspect_index.py), so runs
+    started by hand or by the job queue never write the same file at once.
+    Blocks until the lock is free.
+    """
+    with open(output_file + '.lock', 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 seconds
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_platform_output(platform, df):
+    """
+    Writes a scored load_platform_reviews() frame to the platform's results CSV
+    with exactly the columns and encoding its script uses. Call it while holding
+    output_lock(); returns the frame that was written.
+    """
+    config = PLATFORMS[platform]
+    output = df.rename(columns={'cleaned_text': config["cleaned_column"]})
+    if "output_columns" in config:
+        output = output[config["output_columns"]]
+    write_csv_atomic(output, config["output"], encoding=config.get("output_encoding", "utf-8"))
+    return output
+
+
+def write_csv_atomic(df, output_file, **to_csv_args):
+    """
+    Writes df to a uniquely named temporary file next to output_file and swaps
+    it in with os.replace, so readers never see a half-written CSV.
+    """
+    directory = os.path.dirname(os.path.abspath(output_file))
+    root, ext = os.path.splitext(os.path.basename(output_file))
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=root + '.', suffix=ext + '.tmp', delete=False) as tmp:
+        pass
+    try:
+        # NamedTemporaryFile creates the file readable by its owner only
+        os.chmod(tmp.name, 0o644)
+        df.to_csv(tmp.name, index=False, **to_csv_args)
+        os.replace(tmp.name, output_file)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise
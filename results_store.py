@@ -0,0 +1,293 @@
+import os
+import io
+import json
+import time
+import sqlite3
+import argparse
+import pandas as pd
+
+from platforms import PLATFORMS
+
+# ---------------------------------------------------------
+# Embedded analytical store for all analyzed reviews
+# ---------------------------------------------------------
+# Every platform's results live in one indexed SQLite table instead of eight
+# separate CSVs. The platform scripts bulk-insert into it after scoring, older
+# Analyzed_*_Final.csv files are imported on first use, and the dashboard runs
+# its counts, filters and exports as SQL so only the rows it shows are loaded.
+
+DB_FILE = "results.db"
+BATCH_ROWS = 5000      # Rows per executemany() call inside one transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    review_text TEXT,
+    cleaned_text TEXT,
+    sentiment TEXT NOT NULL,
+    review_time TEXT,
+    extra TEXT,
+    analyzed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_platform_sentiment ON reviews (platform, sentiment);
+CREATE INDEX IF NOT EXISTS idx_reviews_platform_time ON reviews (platform, review_time);
+CREATE TABLE IF NOT EXISTS imports (
+    platform TEXT PRIMARY KEY,
+    source_mtime REAL,
+    rows INTEGER NOT NULL,
+    columns TEXT,
+    imported_at REAL NOT NULL
+);
+"""
+
+TEXT_COLUMNS = ['content', 'Singlish', 'review_body']
+CLEANED_COLUMNS = ['cleaned_review', 'cleaned_text']
+TIME_COLUMNS = ['at', 'date', 'review_date', 'timestamp']
+
+
+def connect(db_file=DB_FILE, setup=True):
+    """
+    Opens the store. setup=False skips the WAL pragma and schema checks for
+    readers that open it after the schema is known to be in place.
+    """
+    conn = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    if setup:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+    return conn
+
+
+def _migrate(conn):
+    """
+    Adds the 'extra' and 'columns' fields to a store created before they existed
+    and forgets the import timestamps, so every CSV is imported again in full.
+    """
+    if 'extra' in [row[1] for row in conn.execute("PRAGMA table_info(reviews)")]:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Checked again under the write lock, another process may have migrated meanwhile
+        if 'extra' not in [row[1] for row in conn.execute("PRAGMA table_info(reviews)")]:
+            conn.execute("ALTER TABLE reviews ADD COLUMN extra TEXT")
+            conn.execute("ALTER TABLE imports ADD COLUMN columns TEXT")
+            conn.execute("UPDATE imports SET source_mtime = NULL")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _first_column(columns, candidates):
+    return next((c for c in candidates if c in columns), None)
+
+
+def _records(df, platform, analyzed_at):
+    text_col = _first_column(df.columns, TEXT_COLUMNS)
+    cleaned_col = _first_column(df.columns, CLEANED_COLUMNS)
+    time_col = _first_column(df.columns, TIME_COLUMNS)
+
+    def column(name):
+        if name is None:
+            return [None] * len(df)
+        return [None if pd.isna(value) else str(value) for value in df[name]]
+
+    # Every other column (score, user name, thumbs-up, ...) is kept as one JSON object per row
+    extra_cols = [c for c in df.columns if c not in (text_col, cleaned_col, time_col, 'sentiment')]
+    if extra_cols:
+        extras = df[extra_cols].astype(object).where(df[extra_cols].notna(), None).to_dict('records')
+        extras = [json.dumps(row, ensure_ascii=False, default=str) for row in extras]
+    else:
+        extras = [None] * len(df)
+
+    sentiments = df['sentiment'].astype(str).str.upper().tolist()
+    return zip([platform] * len(df), column(text_col), column(cleaned_col), sentiments,
+               column(time_col), extras, [analyzed_at] * len(df))
+
+
+def _restore_columns(conn, platform, chunk):
+    """
+    Turns stored rows back into the columns of the analyzed CSV they came from.
+    Rows imported before the original columns were recorded keep the store's own columns.
+    """
+    row = conn.execute("SELECT columns FROM imports WHERE platform = ?", (platform,)).fetchone()
+    if row is None or row[0] is None:
+        return chunk.drop(columns='extra')
+
+    columns = json.loads(row[0])
+    restored = pd.DataFrame([json.loads(extra) if extra else {} for extra in chunk['extra']], index=chunk.index)
+    for stored, candidates in [('review_text', TEXT_COLUMNS), ('cleaned_text', CLEANED_COLUMNS),
+                               ('review_time', TIME_COLUMNS)]:
+        original = _first_column(columns, candidates)
+        if original is not None:
+            restored[original] = chunk[stored]
+    restored['sentiment'] = chunk['sentiment']
+    return restored.reindex(columns=columns)
+
+
+def save_results(conn, platform, chunks, source_mtime=None):
+    """
+    Replaces all stored rows of a platform with the given DataFrame chunk(s)
+    in one transaction, so readers see either the old or the new results.
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+
+    analyzed_at = time.time()
+    total = 0
+    columns = None
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM reviews WHERE platform = ?", (platform,))
+        for chunk in chunks:
+            columns = columns or list(chunk.columns)
+            for start in range(0, len(chunk), BATCH_ROWS):
+                batch = chunk.iloc[start:start + BATCH_ROWS]
+                conn.executemany(
+                    "INSERT INTO reviews (platform, review_text, cleaned_text, sentiment, review_time, extra, analyzed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    _records(batch, platform, analyzed_at)
+                )
+                total += len(batch)
+        conn.execute(
+            "INSERT OR REPLACE INTO imports (platform, source_mtime, rows, columns, imported_at) VALUES (?, ?, ?, ?, ?)",
+            (platform, source_mtime, total, json.dumps(columns) if columns else None, analyzed_at)
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return total
+
+
+def save_platform_results(platform, df, db_file=DB_FILE):
+    """
+    Entry point for the platform scripts: bulk-inserts one finished analysis.
+    The results CSV's modification time is recorded so it is not imported again.
+    """
+    output = PLATFORMS[platform]["output"]
+    source_mtime = os.path.getmtime(output) if os.path.exists(output) else None
+    conn = connect(db_file)
+    try:
+        return save_results(conn, platform, df, source_mtime)
+    finally:
+        conn.close()
+
+
+def sync_csv_outputs(conn):
+    """
+    Imports every Analyzed_*_Final.csv that is newer than what the store holds
+    (e.g. CSVs produced before the store existed). Returns the platforms imported.
+    """
+    imported = {row[0]: row[1] for row in conn.execute("SELECT platform, source_mtime FROM imports")}
+    refreshed = []
+    for platform, config in PLATFORMS.items():
+        path = config["output"]
+        if not os.path.exists(path):
+            continue
+        mtime = os.path.getmtime(path)
+        if platform in imported and imported[platform] is not None and imported[platform] >= mtime:
+            continue
+        save_results(conn, platform, pd.read_csv(path, chunksize=BATCH_ROWS), mtime)
+        refreshed.append(platform)
+    return refreshed
+
+
+def _sentiment_filter(platform, sentiments):
+    clause = "platform = ?"
+    params = [platform]
+    if sentiments is not None:
+        clause += f" AND sentiment IN ({', '.join('?' * len(sentiments))})" if sentiments else " AND 0"
+        params += list(sentiments)
+    return clause, params
+
+
+def platforms_in_store(conn):
+    return [row[0] for row in conn.execute("SELECT DISTINCT platform FROM reviews ORDER BY platform")]
+
+
+def sentiment_counts(conn, platform, sentiments=None):
+    """
+    Number of reviews per sentiment for a platform (optionally filtered).
+    """
+    clause, params = _sentiment_filter(platform, sentiments)
+    return pd.read_sql_query(
+        f"SELECT sentiment, COUNT(*) AS reviews FROM reviews WHERE {clause} GROUP BY sentiment ORDER BY reviews DESC",
+        conn, params=params
+    )
+
+
+def review_texts(conn, platform, sentiments=None, limit=None):
+    """
+    Yields the review texts of a platform (optionally filtered and limited) without building a DataFrame.
+    """
+    clause, params = _sentiment_filter(platform, sentiments)
+    query = f"SELECT COALESCE(cleaned_text, review_text) FROM reviews WHERE {clause} ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    for (text,) in conn.execute(query, params):
+        if text:
+            yield text
+
+
+def filtered_reviews(conn, platform, sentiments=None, limit=None):
+    """
+    Stored rows of a platform with their original CSV columns, optionally
+    limited for on-screen display.
+    """
+    clause, params = _sentiment_filter(platform, sentiments)
+    query = f"SELECT review_text, cleaned_text, sentiment, review_time, extra FROM reviews WHERE {clause} ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return _restore_columns(conn, platform, pd.read_sql_query(query, conn, params=params))
+
+
+def export_csv(conn, platform, sentiments=None):
+    """
+    Filtered rows of a platform as CSV bytes with all columns of the analyzed
+    CSV, written chunk by chunk.
+    """
+    clause, params = _sentiment_filter(platform, sentiments)
+    buffer = io.StringIO()
+    header = True
+    for chunk in pd.read_sql_query(
+        f"SELECT review_text, cleaned_text, sentiment, review_time, extra FROM reviews WHERE {clause} ORDER BY id",
+        conn, params=params, chunksize=BATCH_ROWS
+    ):
+        _restore_columns(conn, platform, chunk).to_csv(buffer, header=header, index=False)
+        header = False
+    return buffer.getvalue().encode('utf-8')
+
+
+def cross_platform_summary(conn, platforms):
+    """
+    Review count and sentiment share of every selected platform, from one grouped query.
+    """
+    if not platforms:
+        return pd.DataFrame(columns=['platform', 'sentiment', 'reviews', 'share'])
+    summary = pd.read_sql_query(
+        f"SELECT platform, sentiment, COUNT(*) AS reviews FROM reviews "
+        f"WHERE platform IN ({', '.join('?' * len(platforms))}) GROUP BY platform, sentiment",
+        conn, params=list(platforms)
+    )
+    summary['share'] = summary['reviews'] / summary.groupby('platform')['reviews'].transform('sum')
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the analyzed CSVs into the results store.")
+    parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    refreshed = sync_csv_outputs(conn)
+    print(f"Imported: {', '.join(refreshed) if refreshed else 'nothing new'}")
+    for row in conn.execute("SELECT platform, rows FROM imports ORDER BY platform"):
+        print(f"  {row[0]:<20}{row[1]:>10,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import io
+import re
+import csv
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+
+# ---------------------------------------------------------
+# Fast loader for the Romanized Sinhala (Singlish) source file
+# ---------------------------------------------------------
+# 'Romanized Sinhala.csv' is UTF-16 and tab separated: the Romanized review
+# (quoted, with tab padding inside the quotes), then its Sinhala-script
+# translation, then dozens of empty padding fields. The loader sniffs the
+# encoding, keeps only the first two fields of every record, strips the tab
+# padding and yields DataFrames of CHUNK_ROWS records at a time.
+
+SOURCE_FILE = "Romanized Sinhala.csv"
+CHUNK_ROWS = 10000
+COLUMNS = ['Singlish', 'Sinhala']
+
+BOMS = [
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+
+def sniff_encoding(path, sample_size=4096):
+    """
+    Detects the file encoding from its byte order mark, or from the NUL-byte
+    pattern of BOM-less UTF-16, falling back to UTF-8.
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # ASCII-heavy UTF-16 text has a NUL in every other byte
+    if sample and sample[1::2].count(0) > len(sample) // 4:
+        return 'utf-16-le'
+    if sample and sample[0::2].count(0) > len(sample) // 4:
+        return 'utf-16-be'
+    return 'utf-8'
+
+
+def clean_field(field):
+    """
+    Replaces the tab padding inside a field with single spaces and trims it.
+    """
+    return re.sub(r'\t+', ' ', field).strip()
+
+
+def iter_singlish_chunks(path=SOURCE_FILE, chunk_rows=CHUNK_ROWS):
+    """
+    Streams the source file and yields DataFrames with 'Singlish' and 'Sinhala'
+    columns. Padding fields are discarded while parsing and empty records skipped.
+    """
+    encoding = sniff_encoding(path)
+    with open(path, 'rb') as raw:
+        text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+        records = []
+        for row in csv.reader(text, delimiter='\t'):
+            if not row:
+                continue
+            singlish = clean_field(row[0])
+            if not singlish:
+                continue
+            # The translation is the next non-empty field (usually row[1])
+            sinhala = next((clean_field(field) for field in row[1:] if field.strip()), '')
+            records.append((singlish, sinhala))
+
+            if len(records) >= chunk_rows:
+                yield pd.DataFrame(records, columns=COLUMNS)
+                records = []
+        if records:
+            yield pd.DataFrame(records, columns=COLUMNS)
+
+
+def load_singlish(path=SOURCE_FILE):
+    """
+    Whole file as one DataFrame (built from the streamed chunks).
+    """
+    chunks = list(iter_singlish_chunks(path))
+    if not chunks:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def legacy_load(path=SOURCE_FILE):
+    """
+    The loading code of Romanized_Sinhala.py before this loader, kept for the benchmark.
+    """
+    df = pd.read_csv(path, header=None, encoding='utf-16', on_bad_lines='skip', engine='python')
+    df = df[[0]]
+    df.columns = ['Singlish']
+    return df.dropna(subset=['Singlish'])
+
+
+def measure(loader, path, repeats):
+    """
+    Best wall time over several runs plus peak traced memory of one run.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = loader(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    loader(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(df), min(timings), peak / 1024 ** 2, df
+
+
+def benchmark(path=SOURCE_FILE, repeats=3):
+    print(f"Benchmarking '{path}' (encoding: {sniff_encoding(path)}, best of {repeats} runs)\n")
+    print(f"{'Loader':<22}{'Rows':>8}{'Time':>10}{'Rows/s':>12}{'Peak mem':>12}{'Avg chars':>11}")
+    for name, loader in [("pd.read_csv (legacy)", legacy_load), ("singlish_loader", load_singlish)]:
+        rows, seconds, peak_mb, df = measure(loader, path, repeats)
+        avg_chars = df['Singlish'].astype(str).str.len().mean()
+        print(f"{name:<22}{rows:>8,}{seconds:>9.3f}s{rows / seconds:>12,.0f}{peak_mb:>9.1f} MB{avg_chars:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the Romanized Sinhala source file or benchmark the loader.")
+    parser.add_argument("path", nargs="?", default=SOURCE_FILE)
+    parser.add_argument("--benchmark", action="store_true", help="Compare against the legacy pd.read_csv path")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.path, args.repeats)
+        return
+
+    df = load_singlish(args.path)
+    print(f"Loaded {len(df):,} records from '{args.path}' ({sniff_encoding(args.path)})")
+    print(df.head())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import transformers
+from transformers import AutoTokenizer
+
+from platforms import (
+    PLATFORMS, MODEL_NAME, LOADER_VERSION, platform_slug, normalize_label, load_platform_reviews,
+    output_lock, write_platform_output
+)
+from results_store import save_platform_results
+from aspect_index import refresh_platform
+
+# ---------------------------------------------------------
+# Pre-tokenized, memory-mapped token cache
+# ---------------------------------------------------------
+# Layout of one cache entry (token_cache/<platform>/<key>/):
+#   ids.bin      every token ID of every review, concatenated (int32, memory-mapped)
+#   offsets.npy  start position of each review inside ids.bin (int64)
+#   lengths.npy  number of tokens of each review (int32)
+#   meta.json    model, tokenizer version and source file signature; written last,
+#                so an entry without it is incomplete and gets rebuilt
+# Reruns that only change backend, batch size or threshold read these arrays
+# directly instead of tokenizing every review again.
+
+CACHE_DIR = "token_cache"
+MAX_CHARS = 512      # Same character cap the platform scripts apply before inference
+MAX_TOKENS = 512     # DistilBERT position limit
+CHUNK_SIZE = 5000    # Reviews tokenized per chunk while building the cache
+
+
+def cache_key(tokenizer):
+    """
+    Identifies the tokenizer and loader version: a change of model, vocabulary,
+    transformers release or loading/cleaning rules produces a new cache entry
+    instead of stale IDs.
+    """
+    signature = json.dumps({
+        "model": tokenizer.name_or_path,
+        "tokenizer": type(tokenizer).__name__,
+        "vocab_size": len(tokenizer),
+        "transformers": transformers.__version__,
+        "max_chars": MAX_CHARS,
+        "max_tokens": MAX_TOKENS,
+        "loader_version": LOADER_VERSION,
+    }, sort_keys=True)
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:12]
+
+
+def source_signature(path):
+    """
+    Size and modification time of the source CSV, used to detect a stale cache.
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def texts_digest(texts):
+    """
+    Hash of the exact texts that were tokenized, used to detect a cache built from other data.
+    """
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def cache_path(platform, tokenizer):
+    return os.path.join(CACHE_DIR, platform_slug(platform), cache_key(tokenizer))
+
+
+def build_token_cache(platform, tokenizer=None):
+    """
+    Tokenizes every cleaned review of a platform once and writes the token IDs
+    and lengths to disk. Returns the cache directory.
+    """
+    if tokenizer is None:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    df = load_platform_reviews(platform)
+    texts = df['cleaned_text'].astype(str).str.slice(0, MAX_CHARS).tolist()
+
+    path = cache_path(platform, tokenizer)
+    os.makedirs(path, exist_ok=True)
+    # meta.json is written last and marks a complete entry: drop it first, so a
+    # crash halfway through leaves an entry that is rebuilt instead of mixed files
+    meta_file = os.path.join(path, "meta.json")
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    offsets = np.zeros(len(texts), dtype=np.int64)
+    lengths = np.zeros(len(texts), dtype=np.int32)
+
+    # Stream token IDs chunk by chunk so only one chunk lives in memory
+    position = 0
+    with open(os.path.join(path, "ids.bin.tmp"), "wb") as ids_file:
+        for start in range(0, len(texts), CHUNK_SIZE):
+            encoded = tokenizer(
+                texts[start:start + CHUNK_SIZE],
+                truncation=True,
+                max_length=MAX_TOKENS
+            )["input_ids"]
+            for i, ids in enumerate(encoded):
+                offsets[start + i] = position
+                lengths[start + i] = len(ids)
+                position += len(ids)
+            np.fromiter(
+                (token for ids in encoded for token in ids), dtype=np.int32
+            ).tofile(ids_file)
+
+    os.replace(os.path.join(path, "ids.bin.tmp"), os.path.join(path, "ids.bin"))
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "lengths.npy"), lengths)
+
+    meta = {
+        "platform": platform,
+        "model": tokenizer.name_or_path,
+        "transformers": transformers.__version__,
+        "key": cache_key(tokenizer),
+        "rows": len(texts),
+        "texts_sha1": texts_digest(texts),
+        "tokens": int(position),
+        "pad_token_id": tokenizer.pad_token_id,
+        "source": source_signature(PLATFORMS[platform]["source"]),
+    }
+    with open(meta_file + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_file + ".tmp", meta_file)
+    return path
+
+
+def load_token_cache(platform, tokenizer=None, texts=None):
+    """
+    Opens the cache of a platform as memory-mapped arrays (nothing is copied into RAM).
+    Builds it first if it is missing, the source CSV changed since it was written
+    or (when given) the cleaned texts no longer match the ones it was built from.
+    """
+    if tokenizer is None:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    path = cache_path(platform, tokenizer)
+    meta_file = os.path.join(path, "meta.json")
+    meta = None
+    if os.path.exists(meta_file):
+        with open(meta_file, encoding="utf-8") as f:
+            meta = json.load(f)
+    stale = (
+        meta is None
+        or meta["source"] != source_signature(PLATFORMS[platform]["source"])
+        or (texts is not None and meta.get("texts_sha1") != texts_digest(texts))
+    )
+    if stale:
+        build_token_cache(platform, tokenizer)
+        with open(meta_file, encoding="utf-8") as f:
+            meta = json.load(f)
+
+    if meta["tokens"]:
+        ids = np.memmap(os.path.join(path, "ids.bin"), dtype=np.int32, mode="r", shape=(meta["tokens"],))
+    else:
+        # np.memmap cannot map an empty file (dataset without reviews)
+        ids = np.zeros(0, dtype=np.int32)
+    offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+    lengths = np.load(os.path.join(path, "lengths.npy"), mmap_mode="r")
+    return ids, offsets, lengths, meta
+
+
+def length_buckets(lengths, batch_size):
+    """
+    Yields batches of row indices with similar token lengths so that padding
+    inside each batch stays minimal.
+    """
+    order = np.argsort(lengths, kind="stable")
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+
+def score_token_cache(platform, model=None, batch_size=64, texts=None):
+    """
+    Runs the sentiment model straight on the cached token arrays and returns
+    one 'Positive' / 'Neutral' / 'Negative' label per review (original row order).
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    if model is None:
+        model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+
+    ids, offsets, lengths, meta = load_token_cache(platform, tokenizer, texts)
+    if len(lengths) == 0:
+        return []
+    pad_id = meta["pad_token_id"] or 0
+    labels = np.empty(len(lengths), dtype=object)
+
+    with torch.inference_mode():
+        for batch in length_buckets(lengths, batch_size):
+            width = int(lengths[batch].max())
+            input_ids = np.full((len(batch), width), pad_id, dtype=np.int64)
+            attention_mask = np.zeros((len(batch), width), dtype=np.int64)
+            for row, i in enumerate(batch):
+                # Zero-copy view into the memory-mapped token file
+                tokens = ids[offsets[i]:offsets[i] + lengths[i]]
+                input_ids[row, :len(tokens)] = tokens
+                attention_mask[row, :len(tokens)] = 1
+
+            logits = model(
+                input_ids=torch.from_numpy(input_ids),
+                attention_mask=torch.from_numpy(attention_mask)
+            ).logits
+            predictions = logits.argmax(dim=-1).tolist()
+            for i, prediction in zip(batch, predictions):
+                labels[i] = normalize_label(model.config.id2label[prediction])
+
+    return labels.tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or score the pre-tokenized review cache.")
+    parser.add_argument("command", choices=["build", "score"])
+    parser.add_argument("platform", choices=list(PLATFORMS.keys()))
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"Step 1: Tokenizing {args.platform} reviews...")
+        start = time.perf_counter()
+        path = build_token_cache(args.platform)
+        print(f"Token cache written to: {path} ({time.perf_counter() - start:.1f}s)")
+        return
+
+    print(f"Step 1: Scoring {args.platform} from the token cache (batch size {args.batch_size})...")
+    start = time.perf_counter()
+    df = load_platform_reviews(args.platform)
+    texts = df['cleaned_text'].astype(str).str.slice(0, MAX_CHARS).tolist()
+    labels = score_token_cache(args.platform, batch_size=args.batch_size, texts=texts)
+    if len(labels) != len(df):
+        print("Error: Token cache does not match the dataset. Rebuild it with the 'build' command.")
+        sys.exit(1)
+
+    df['sentiment'] = labels
+    output_file = PLATFORMS[args.platform]["output"]
+    # Same file and columns as the platform script
+    with output_lock(output_file):
+        output = write_platform_output(args.platform, df)
+        save_platform_results(args.platform, output)
+        refresh_platform(args.platform)
+
+    print(f"\n--- Process Completed Successfully! ---")
+    print(f"Total rows analyzed: {len(df)} in {time.perf_counter() - start:.1f}s")
+    print(f"Results saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()